@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 
 from .robot_api import router as robot_router
+from .admin_api import router as admin_router
 
 router = APIRouter()
 router.include_router(robot_router)
+router.include_router(admin_router)
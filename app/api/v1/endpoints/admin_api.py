@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException
+
+from .consts import ADMINISTRATION
+from .robot_api import robot
+from ....profiling import profiles, is_valid_token
+
+
+async def verify_admin_token(
+        x_admin_token: Optional[str] = Header(None)):
+    """Allows the request only with the `X-Admin-Token` header equal to
+    `ROBOTS_ADMIN_TOKEN`.
+
+    :raises HTTPException: If the token is missing, wrong or not configured
+        (403 Forbidden).
+    """
+    if not is_valid_token(x_admin_token):
+        raise HTTPException(status_code=403, detail='Invalid admin token.')
+
+
+router = APIRouter(prefix='/admin',
+                   dependencies=[Depends(verify_admin_token)])
+
+
+@router.get('/profiles', tags=[ADMINISTRATION])
+async def list_profiles() -> List[Dict]:
+    """Lists the most recent request profiles, newest first.
+
+        A request is profiled when it carries the
+        `X-Profile: <ROBOTS_ADMIN_TOKEN>` header or falls into the sampling
+        rate set by `ROBOTS_PROFILE_SAMPLE_RATE`. All `/admin` endpoints
+        require the `X-Admin-Token: <ROBOTS_ADMIN_TOKEN>` header.
+
+        :return: A JSON list with the id, method, path, status code and
+            wall time of every stored profile.
+
+        ## Example
+        ```
+        GET /admin/profiles
+        ```
+    """
+    return [profile.summary() for profile in profiles.list()]
+
+
+@router.get('/profiles/{profile_id}', tags=[ADMINISTRATION])
+async def get_profile(profile_id: str) -> Dict:
+    """Retrieves a single request profile.
+
+        :param profile_id: The id returned in the `X-Profile-Id` header
+            of the profiled response.
+        :return: A JSON object with the wall time of the request, the time
+            spent in the database, psutil and subprocess calls and
+            the call tree of the request. The call tree only contains code
+            run by the request's own asyncio task, excluding the time it
+            was waiting; that time is reported by the categories.
+        :raises HTTPException: If the profile is not found
+            (404 Not Found).
+
+        ## Example
+        ```
+        curl -X POST -H "X-Profile: $TOKEN" http://127.0.0.1:8000/stop
+        curl -H "X-Admin-Token: $TOKEN" http://127.0.0.1:8000/admin/profiles/3f2b9c...
+        ```
+    """
+    profile = profiles.get(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404,
+                            detail=f'Profile {profile_id} not found.')
+    return profile.to_dict()
+
+
+@router.get('/admission', tags=[ADMINISTRATION])
+async def admission() -> Dict:
+    """Retrieves the state of the robot start admission control.
+
+        :return: A JSON object with the number of running robots,
+            the depth of the queue of pending starts, the number of admitted,
+            queued and rejected starts and the reason of the last overload.
+
+        ## Example
+        ```
+        GET /admin/admission
+        ```
+    """
+    return robot.admission.stats()
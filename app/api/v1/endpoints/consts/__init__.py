@@ -1,5 +1,6 @@
-from .consts import TAGS_METADATA, ROBOT_MANAGEMENT, ROBOT_STATISTICS
+from .consts import (TAGS_METADATA, ROBOT_MANAGEMENT, ROBOT_STATISTICS,
+                     ADMINISTRATION)
 
 __all__ = [
-    'TAGS_METADATA', 'ROBOT_MANAGEMENT', 'ROBOT_STATISTICS'
+    'TAGS_METADATA', 'ROBOT_MANAGEMENT', 'ROBOT_STATISTICS', 'ADMINISTRATION'
 ]
@@ -1,5 +1,6 @@
 ROBOT_MANAGEMENT = 'Robot Management'
 ROBOT_STATISTICS = 'Robot Statistics'
+ADMINISTRATION = 'Administration'
 
 TAGS_METADATA = [
     {
@@ -9,5 +10,9 @@ TAGS_METADATA = [
     {
         'name': ROBOT_STATISTICS,
         'description': 'Statistical and analytical data'
+    },
+    {
+        'name': ADMINISTRATION,
+        'description': 'Diagnostics of the API itself'
     }
 ]
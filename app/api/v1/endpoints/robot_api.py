@@ -1,29 +1,59 @@
-import sys
-import os
-from typing import List
+import asyncio
+import logging
+from datetime import datetime
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
-                             '..', '..', '..'))
-
-if __package__ is None or __package__ == "":
-    from consts import TAGS_METADATA, ROBOT_MANAGEMENT, ROBOT_STATISTICS
-else:
-    from .consts import TAGS_METADATA, ROBOT_MANAGEMENT, ROBOT_STATISTICS
-from controllers import RobotManager
-from db import services
-from db import models
+from .consts import ROBOT_MANAGEMENT, ROBOT_STATISTICS
+from ....controllers import RobotManager
+from ....db import services
+from ....db import models
+from ....settings import settings
 
 router = APIRouter()
 
 robot = RobotManager()
 
+logging.basicConfig(level=logging.INFO,
+                    format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+journal_replay_task = None
+
+
+async def replay_journal_periodically():
+    """Brings the database schema up to date, then replays the robot
+    journal into the database right away and every
+    `ROBOTS_JOURNAL_REPLAY_INTERVAL` seconds."""
+    # Load the database stack off the event loop.
+    await asyncio.to_thread(getattr, services, 'replay_journal')
+    await services.migrate_database()
+    while True:
+        try:
+            await services.replay_journal()
+        except Exception as e:
+            logger.error(f'Error replaying the robot journal: {e}')
+        await asyncio.sleep(settings.journal_replay_interval)
+
 
 @router.on_event('startup')
 async def startup_event():
-    "Create database on SQlite"
-    await services.create_database()
+    """Start migrating the database and replaying the robot journal
+    in the background, so the API is ready without waiting for them.
+    """
+    global journal_replay_task
+    journal_replay_task = asyncio.create_task(replay_journal_periodically())
+    # Starts counting the robots already running on the host.
+    robot.running_count()
+
+
+@router.on_event('shutdown')
+async def shutdown_event():
+    "Stop the journal replay and apply the records left"
+    if journal_replay_task:
+        journal_replay_task.cancel()
+    await services.replay_journal()
 
 
 @router.post('/start', tags=[ROBOT_MANAGEMENT])
@@ -40,6 +70,10 @@ async def start(start_number: int = 0):
         started robot.
         :raises FileNotFoundError: If the robot script is not found
         (404 Not Found).
+        :raises HTTPException: If the host has no capacity for another robot:
+        429 Too Many Requests when the queue of pending starts is full,
+        503 Service Unavailable when the start waited in the queue for too
+        long. Both responses carry the `Retry-After` header.
 
          ## Example
          Start a new robot instance with initial number is 0
@@ -100,12 +134,30 @@ async def stop(pid: int = 0):
 
 
 @router.get('/stats', tags=[ROBOT_STATISTICS])
-async def stats(offset: int = 0, limit: int = 20, order_by: str = 'asc') -> List[models.SRobot]:
-    """Retrieves robot run statistics with pagination and sorting.
+async def stats(response: Response,
+                offset: int = 0, limit: int = 20, order_by: str = 'asc',
+                start_date_from: Optional[datetime] = None,
+                start_date_to: Optional[datetime] = None,
+                pid: Optional[int] = None,
+                min_duration: Optional[int] = None,
+                max_duration: Optional[int] = None,
+                status: Optional[Literal['running', 'finished']] = None,
+                with_total: bool = False) -> List[models.SRobot]:
+    """Retrieves robot run statistics with filtering, pagination and sorting.
 
         :param offset: Offset from the beginning of the result set.
         :param limit: Maximum number of records to return.
         :param order_by: Sorting direction: 'asc' (ascending) or 'desc'.
+        :param start_date_from: Only runs started at or after this time.
+        :param start_date_to: Only runs started before this time.
+        :param pid: Only runs with this process id.
+        :param min_duration: Only runs lasting at least this many seconds.
+        :param max_duration: Only runs lasting at most this many seconds.
+        :param status: 'running' for runs without a duration yet,
+            'finished' for completed runs.
+        :param with_total: Return the number of runs matching the filters
+            in the `X-Total-Count` header. The header is left out if
+            the count fails.
         :return: A JSON response containing a list of dictionaries.
 
         The structure of each robot run dictionary is as follows:
@@ -124,5 +176,27 @@ async def stats(offset: int = 0, limit: int = 20, order_by: str = 'asc') -> List
         ```
         GET /stats?offset=20&limit=10&order_by=desc
         ```
+        Get the runs longer than an hour started in a given week together
+        with their total number:
+        ```
+        GET /stats?start_date_from=2024-03-04&start_date_to=2024-03-11&min_duration=3600&with_total=true
+        ```
+        Get the running robots with PID 1234:
+        ```
+        GET /stats?pid=1234&status=running
+        ```
     """
-    return await services.get_stats(offset, limit, order_by)
+    filters = dict(start_date_from=start_date_from,
+                   start_date_to=start_date_to,
+                   pid=pid,
+                   min_duration=min_duration,
+                   max_duration=max_duration,
+                   status=status)
+
+    if with_total:
+        total = await services.count_stats(**filters)
+        # None if the count failed; the error has already been reported.
+        if total is not None:
+            response.headers['X-Total-Count'] = str(total)
+
+    return await services.get_stats(offset, limit, order_by, **filters)
@@ -1,5 +1,6 @@
+from .admission import AdmissionController
 from .robot_manager import RobotManager
 
 __all__ = [
-    'RobotManager'
+    'AdmissionController', 'RobotManager'
 ]
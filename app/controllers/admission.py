@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import psutil
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionController:
+    """
+    This class limits the number of robots started on the host.
+    A start is admitted immediately while there is free capacity, otherwise
+    it waits in a bounded FIFO queue until a robot stops or the host
+    load drops. Starts which do not fit are rejected:
+
+    * 429 Too Many Requests - the queue of pending starts is full.
+    * 503 Service Unavailable - a queued start was not admitted in time.
+
+    Both responses carry the `Retry-After` header.
+
+    ## Example
+
+    ```python
+    admission = AdmissionController(running_count=lambda: 0, max_robots=10)
+
+    await admission.admit()
+    try:
+        ...  # start the robot
+    finally:
+        admission.release()
+    ```
+    """
+    def __init__(self, running_count: Callable[[], int],
+                 max_robots: int = 50, max_queue: int = 10,
+                 queue_timeout: float = 30.0,
+                 max_cpu_percent: float = 90.0,
+                 max_memory_percent: float = 90.0,
+                 max_load_per_cpu: float = 2.0,
+                 retry_after: int = 5,
+                 poll_interval: float = 0.5,
+                 cpu_sample_interval: float = 0.5):
+        self.running_count = running_count
+        self.max_robots = max_robots
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_cpu_percent = max_cpu_percent
+        self.max_memory_percent = max_memory_percent
+        self.max_load_per_cpu = max_load_per_cpu
+        self.retry_after = retry_after
+        self.poll_interval = poll_interval
+        self.cpu_sample_interval = cpu_sample_interval
+
+        self.reserved = 0
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = {'queue_full': 0, 'timeout': 0}
+        self.last_overload: Optional[str] = None
+        self._waiters: deque = deque()
+
+        # The first call only starts the measurement and returns 0.0.
+        psutil.cpu_percent(interval=None)
+        self._cpu_percent = 0.0
+        self._cpu_sampled_at = time.monotonic()
+
+    def _cpu_sample(self) -> float:
+        """Returns the host CPU usage, sampled at most every
+        `cpu_sample_interval` seconds.
+
+        `psutil.cpu_percent(interval=None)` measures the usage since its
+        previous call, so back-to-back calls during a burst of starts
+        would measure nothing and return 0.0.
+        """
+        now = time.monotonic()
+        if now - self._cpu_sampled_at >= self.cpu_sample_interval:
+            self._cpu_percent = psutil.cpu_percent(interval=None)
+            self._cpu_sampled_at = now
+        return self._cpu_percent
+
+    def _host_overload(self) -> Optional[str]:
+        """Checks the host CPU, memory and load-average thresholds.
+
+        :return: A description of the exceeded threshold or None.
+        """
+        if self.max_cpu_percent:
+            cpu = self._cpu_sample()
+            if cpu >= self.max_cpu_percent:
+                return f'CPU usage is {cpu}%'
+        if self.max_memory_percent:
+            memory = psutil.virtual_memory().percent
+            if memory >= self.max_memory_percent:
+                return f'Memory usage is {memory}%'
+        if self.max_load_per_cpu:
+            load = psutil.getloadavg()[0] / (psutil.cpu_count() or 1)
+            if load >= self.max_load_per_cpu:
+                return f'Load average per CPU is {load:.2f}'
+        return None
+
+    def _overload(self) -> Optional[str]:
+        """Checks whether one more robot can be started right now.
+
+        :return: The reason why it can't or None.
+        """
+        if self.running_count() + self.reserved >= self.max_robots:
+            reason = f'{self.max_robots} robots are already running'
+        else:
+            reason = self._host_overload()
+        self.last_overload = reason
+        return reason
+
+    def _drain(self):
+        """Admits queued starts in order while there is free capacity."""
+        while self._waiters:
+            if self._waiters[0].done():
+                self._waiters.popleft()
+                continue
+            if self._overload():
+                break
+            self.reserved += 1
+            self._waiters.popleft().set_result(None)
+
+    def _forget(self, waiter: asyncio.Future):
+        """Removes a waiter which gave up from the queue."""
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _reject(self, reason: str, status_code: int, detail: str):
+        self.rejected[reason] += 1
+        logger.warning(f'Robot start rejected: {detail}')
+        raise HTTPException(
+            status_code=status_code,
+            detail=detail,
+            headers={'Retry-After': str(self.retry_after)})
+
+    async def admit(self):
+        """Waits until a robot may be started and reserves a slot for it.
+
+        Every successful call must be followed by `release`.
+
+        :raises HTTPException: 429 if the queue of pending starts is full,
+            503 if the start was not admitted within the queue timeout.
+        """
+        if not self._waiters and not self._overload():
+            self.reserved += 1
+            self.admitted += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._reject('queue_full', 429,
+                         f'Too many pending robot starts: '
+                         f'{self.last_overload}.')
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        self.queued += 1
+        deadline = loop.time() + self.queue_timeout
+
+        try:
+            while not waiter.done():
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    self._forget(waiter)
+                    break
+                try:
+                    await asyncio.wait_for(
+                        asyncio.shield(waiter),
+                        min(self.poll_interval, remaining))
+                except asyncio.TimeoutError:
+                    self._drain()
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.reserved -= 1
+            self._forget(waiter)
+            raise
+
+        if waiter.cancelled():
+            self._reject('timeout', 503,
+                         f'Robot start was not admitted within '
+                         f'{self.queue_timeout} seconds: '
+                         f'{self.last_overload}.')
+        self.admitted += 1
+
+    def release(self):
+        """Frees the slot reserved by `admit` once the robot has been
+        started (or failed to start)."""
+        self.reserved -= 1
+
+    def notify(self):
+        """Lets queued starts proceed after robots have been stopped."""
+        self._drain()
+
+    def stats(self) -> Dict:
+        """Returns the counters used to tune the admission limits."""
+        return {
+            'running': self.running_count(),
+            'max_robots': self.max_robots,
+            'reserved': self.reserved,
+            'queue_depth': len(self._waiters),
+            'max_queue': self.max_queue,
+            'admitted': self.admitted,
+            'queued': self.queued,
+            'rejected': dict(self.rejected),
+            'cpu_percent': self._cpu_percent,
+            'last_overload': self.last_overload,
+        }
@@ -1,19 +1,34 @@
 import asyncio
 import os
-import sys
 import signal
 import psutil
 import datetime
 import subprocess
 import json
 import time
-from typing import Dict
+from typing import Dict, Set
 
 from fastapi import HTTPException, Response
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from .admission import AdmissionController
+from ..db import services
+from ..profiling import span
+from ..settings import settings
 
-from db import services
+ROBOT_MODULE = 'app.robot.robot_script'
+ROBOT_SCRIPT = 'robot_script.py'
+
+# Seconds between scans of the host process list.
+SCAN_INTERVAL = 0.5
+
+
+def _is_robot(cmdline) -> bool:
+    """Checks whether a command line runs a robot, either as
+    `python -m app.robot.robot_script` or `python robot_script.py`."""
+    if not cmdline or 'python' not in os.path.basename(cmdline[0]).lower():
+        return False
+    return any(arg == ROBOT_MODULE or arg.endswith(ROBOT_SCRIPT)
+               for arg in cmdline[1:])
 
 
 class RobotManager:
@@ -25,7 +40,7 @@ class RobotManager:
     ## Example
 
     ```python
-    from controllers import RobotManager
+    from app.controllers import RobotManager
 
     robot = RobotManager()
     await robot.start()
@@ -34,8 +49,74 @@ class RobotManager:
     """
     def __init__(self):
         self.project_root = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), '..')
+            os.path.dirname(os.path.abspath(__file__)), '..', '..')
         self.lock = asyncio.Lock()
+        self.processes: Dict[int, subprocess.Popen] = {}
+        self._robot_pids: Set[int] = set()
+        self._scanned_at = 0.0
+        self._scan_task = None
+        self.admission = AdmissionController(
+            running_count=self.running_count,
+            max_robots=settings.max_robots,
+            max_queue=settings.start_queue_size,
+            queue_timeout=settings.start_queue_timeout,
+            max_cpu_percent=settings.max_cpu_percent,
+            max_memory_percent=settings.max_memory_percent,
+            max_load_per_cpu=settings.max_load_per_cpu,
+            retry_after=settings.retry_after)
+
+    @staticmethod
+    def _scan_robots() -> Set[int]:
+        """Finds the PIDs of all robot processes running on the host,
+        including robots started from the console or by an earlier
+        API process.
+
+        A virtualenv `python.exe` on Windows is a launcher which runs
+        the base interpreter as a child with the same command line;
+        such children are skipped, so every robot is counted once.
+        """
+        robots = {}
+        with span('psutil'):
+            for proc in psutil.process_iter(['pid', 'ppid', 'cmdline']):
+                if _is_robot(proc.info['cmdline']):
+                    robots[proc.info['pid']] = proc.info['ppid']
+        return {pid for pid, ppid in robots.items() if ppid not in robots}
+
+    async def refresh_running(self):
+        """Rescans the host for running robots in a worker thread, since
+        reading the command line of every process is slow on Windows."""
+        self._robot_pids = await asyncio.to_thread(self._scan_robots)
+        self._scanned_at = time.monotonic()
+        self.admission.notify()
+
+    async def _refresh_in_background(self):
+        try:
+            await self.refresh_running()
+        finally:
+            self._scan_task = None
+
+    def running_count(self) -> int:
+        """Returns the number of robots running on the host.
+
+        The count comes from the last scan of the host process list, which
+        is refreshed in the background at most every `SCAN_INTERVAL`
+        seconds; robots started by this manager since then are counted
+        from their `Popen` handles.
+        """
+        if (time.monotonic() - self._scanned_at >= SCAN_INTERVAL and
+                self._scan_task is None):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._scan_task = loop.create_task(
+                    self._refresh_in_background())
+
+        for pid, process in list(self.processes.items()):
+            if process.poll() is not None:
+                del self.processes[pid]
+        return len(self._robot_pids | set(self.processes))
 
     async def start(self, start_number: int = 0):
         """Starts a new robot instance.
@@ -46,12 +127,13 @@ class RobotManager:
                 with the PID of the started robot(s).
             :raises HTTPException: If the robot script is not found or
                 an error occurs while starting the process.
+                429 or 503 with the `Retry-After` header if the host
+                has no capacity for another robot.
         """
-        robot_script_path = os.path.join(self.project_root, 'robot',
-                                         'robot_script.py')
+        await self.admission.admit()
 
-        async with self.lock:
-            try:
+        try:
+            async with self.lock:
                 venv_path = os.environ.get('VIRTUAL_ENV')
 
                 if venv_path:
@@ -59,11 +141,14 @@ class RobotManager:
                 else:
                     python_path = 'python'
 
-                instance_bot = subprocess.Popen(
-                    [python_path, robot_script_path, '--count',
-                     str(start_number)],
-                    creationflags=subprocess.CREATE_NEW_CONSOLE
-                )
+                with span('subprocess'):
+                    instance_bot = subprocess.Popen(
+                        [python_path, '-m', ROBOT_MODULE,
+                         '--count', str(start_number)],
+                        cwd=self.project_root,
+                        creationflags=subprocess.CREATE_NEW_CONSOLE
+                    )
+                self.processes[instance_bot.pid] = instance_bot
 
                 message = f'Robot started successfully.'
 
@@ -71,10 +156,12 @@ class RobotManager:
                     content=json.dumps({'message': message}),
                     media_type="application/json", status_code=200)
 
-            except FileNotFoundError:
-                raise HTTPException(
-                    status_code=404,
-                    detail='Robot script not found.')
+        except FileNotFoundError:
+            raise HTTPException(
+                status_code=404,
+                detail='Robot script not found.')
+        finally:
+            self.admission.release()
 
     async def _stop_and_update_robot(self, proc: Dict):
         """Stops a robot process and updates information in the database.
@@ -82,9 +169,11 @@ class RobotManager:
             :param proc: A dictionary containing information
                 about the robot process (id, pid, start_date).
             """
-        p = psutil.Process(proc.get("pid"))
+        with span('psutil'):
+            p = psutil.Process(proc.get("pid"))
+            create_time = p.create_time()
         now_time = time.time()
-        duration = int(now_time - p.create_time())
+        duration = int(now_time - create_time)
         await services.update_robot(proc.get("id"), duration)
         await self._stop_process(proc.get("pid"), proc.get("start_date"))
 
@@ -97,7 +186,9 @@ class RobotManager:
                 PID is not found or not running.
             """
         try:
-            p = psutil.Process(pid=pid)
+            with span('psutil'):
+                p = psutil.Process(pid=pid)
+                create_time = p.create_time()
             if not p:
                 raise HTTPException(
                     status_code=400,
@@ -105,8 +196,7 @@ class RobotManager:
                 )
 
             tz = datetime.timezone.utc
-            sql_datetime = datetime.datetime.fromtimestamp(p.create_time(),
-                                                           tz=tz)
+            sql_datetime = datetime.datetime.fromtimestamp(create_time, tz=tz)
             prc = await services.get_process(sql_datetime, pid)
             if not prc:
                 raise HTTPException(
@@ -150,6 +240,8 @@ class RobotManager:
                 message = "All robots have been stopped!"
             else:
                 message = await self._stop_robot_by_pid(pid)
+        # Count the stopped robots out right away.
+        await self.refresh_running()
 
         return Response(
             content=json.dumps({'message': message}),
@@ -164,18 +256,21 @@ class RobotManager:
         :param start_date: Process start date
         """
         try:
-            pr = psutil.Process(pid=pid)
+            with span('psutil'):
+                pr = psutil.Process(pid=pid)
+                create_time = pr.create_time()
         except psutil.NoSuchProcess:
             return
 
         tz = datetime.timezone.utc
-        sql_datetime = datetime.datetime.fromtimestamp(pr.create_time(), tz=tz)
+        sql_datetime = datetime.datetime.fromtimestamp(create_time, tz=tz)
 
         if start_date == sql_datetime.replace(tzinfo=None):
             try:
-                prc = subprocess.run(
-                    ['taskkill', '/F', '/T', '/PID', str(pid)],
-                    capture_output=True, text=True)
+                with span('subprocess'):
+                    prc = subprocess.run(
+                        ['taskkill', '/F', '/T', '/PID', str(pid)],
+                        capture_output=True, text=True)
             except psutil.NoSuchProcess:
                 pass
             except Exception as e:
@@ -1,5 +1,21 @@
-from .robot import Base, Robot, SRobot
+import importlib
+
+# Names are imported on first access, so that using the pydantic schemas
+# doesn't load SQLAlchemy.
+_EXPORTS = {
+    'Base': '.robot',
+    'Robot': '.robot',
+    'SRobot': '.schemas',
+}
 
 __all__ = [
     'Base', 'Robot', 'SRobot'
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,8 +1,7 @@
 from typing import Optional
 from datetime import datetime
 
-from pydantic import BaseModel
-from sqlalchemy import Column, Integer, DateTime, func
+from sqlalchemy import Column, Integer, DateTime, Index, func
 from sqlalchemy.orm import mapped_column, Mapped
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -11,6 +10,15 @@ Base = declarative_base()
 
 class Robot(Base):
     __tablename__ = "robots"
+    __table_args__ = (
+        # Covers every /stats filter, so counting never reads the table.
+        Index('ix_robots_start_date_pid_duration',
+              'start_date', 'pid', 'duration'),
+        Index('ix_robots_pid_start_date_duration',
+              'pid', 'start_date', 'duration'),
+        # Also serves the running robots (duration IS NULL).
+        Index('ix_robots_duration_start_date', 'duration', 'start_date'),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
     start_date: Mapped[datetime]
@@ -24,11 +32,3 @@ class Robot(Base):
         self.start_number = start_number
         self.pid = pid
 
-
-class SRobot(BaseModel):
-    id: int
-    start_date: Optional[datetime] = None
-    pid: int
-    duration: Optional[int] = None
-    start_number: int
-    updated_at: Optional[datetime] = None
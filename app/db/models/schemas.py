@@ -0,0 +1,13 @@
+from typing import Optional
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class SRobot(BaseModel):
+    id: int
+    start_date: Optional[datetime] = None
+    pid: int
+    duration: Optional[int] = None
+    start_number: int
+    updated_at: Optional[datetime] = None
@@ -1,7 +1,32 @@
-from .robot import set_robot, update_robot, get_stats, get_process, get_processes
-from .create_database import create_database
+import importlib
+
+# Names are imported on first access: the SQLAlchemy stack is only loaded
+# when the database is actually used.
+_EXPORTS = {
+    'set_robot': '.robot',
+    'update_robot': '.robot',
+    'get_stats': '.robot',
+    'count_stats': '.robot',
+    'get_process': '.robot',
+    'get_processes': '.robot',
+    'create_database': '.create_database',
+    'migrate_database': '.create_database',
+    'replay_journal': '.journal',
+    'JournalWriter': '.journal_writer',
+    'START': '.journal_writer',
+    'EXIT': '.journal_writer',
+}
 
 __all__ = [
-    'set_robot', 'update_robot', 'get_stats', 'create_database', 'get_process',
-    'get_processes'
+    'set_robot', 'update_robot', 'get_stats', 'count_stats', 'create_database',
+    'migrate_database', 'get_process', 'get_processes', 'JournalWriter',
+    'replay_journal', 'START', 'EXIT'
 ]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -1,19 +1,16 @@
 import asyncio
-import sys
-import os
-from pathlib import Path
 
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, \
     AsyncConnection
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.exc import SQLAlchemyError
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from ...profiling import span
+from ...settings import settings
 
-db_file = Path(__file__).resolve().parent.parent / 'robots.db'
+db_file = settings.database_file
 DATABASE_URL = f'sqlite+aiosqlite:///{db_file}'
 
-
 async def create_async_engine_and_session():
     """Creates an asynchronous SQLAlchemy engine and session factory.
 
@@ -45,11 +42,12 @@ def connection_and_session(func):
     """
     async def wrapper(*args, **kwargs):
         try:
-            engine, async_session = await create_async_engine_and_session()
+            with span('db'):
+                engine, async_session = await create_async_engine_and_session()
 
-            async with engine.begin() as connection:
-                async with async_session() as session:
-                    return await func(connection, session, *args, **kwargs)
+                async with engine.begin() as connection:
+                    async with async_session() as session:
+                        return await func(connection, session, *args, **kwargs)
 
         except SQLAlchemyError as e:
             print(f'SQLAlchemy Error: {e}')
@@ -1,31 +1,30 @@
 import asyncio
 import logging
-import sys
-import os
-from pathlib import Path
 
-if __package__ is None or __package__ == "":
-    from connection import create_async_engine_and_session
-else:
-    from .connection import create_async_engine_and_session
-
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
-
-from models import Base
-
-db_file = Path(__file__).resolve().parent.parent / 'robots.db'
+from .connection import create_async_engine_and_session, db_file
+from ..models import Base
 
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+def _create_missing_indexes(connection):
+    """Creates the indexes added to the models after the database was
+    created: `create_all` skips existing tables together with their
+    indexes."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
+
 async def create_database():
     """Creates the database schema if the database file doesn't exist.
 
     This function checks if the database file exists and, if not, creates
     the database schema using the SQLAlchemy models defined in the `models`
-    module.
+    module. An existing database is left untouched, so robots can call it
+    cheaply on every start; `migrate_database` brings it up to date.
 
     Logs an informational message upon successful database creation and
     logs any errors encountered during the process.
@@ -41,5 +40,22 @@ async def create_database():
             logger.error(f'Error creating database: {e}')
 
 
+async def migrate_database():
+    """Creates the missing tables and indexes of an existing database.
+
+    Building an index on a large table holds the SQLite write lock,
+    so only the API runs this, once, in the background after startup.
+    """
+    await create_database()
+    engine, _ = await create_async_engine_and_session()
+
+    try:
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(_create_missing_indexes)
+    except Exception as e:
+        logger.error(f'Error migrating database: {e}')
+
+
 if __name__ == '__main__':
-    asyncio.run(create_database())
+    asyncio.run(migrate_database())
@@ -0,0 +1,212 @@
+import asyncio
+import json
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+from sqlalchemy import and_, bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from .connection import connection_and_session
+from .journal_writer import START, EXIT
+from ..models import Robot
+from ...settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+def _read_segment(path: Path) -> List[Dict]:
+    """Reads the records of a journal segment.
+
+    A torn last line left by a crash is skipped.
+
+    :param path: Path to the segment file.
+    :return: A list of records.
+    """
+    records = []
+    with open(path, 'rb') as file:
+        for line in file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                logger.warning(f'Skipping a damaged journal record in {path}')
+    return records
+
+
+def _is_running(pid: int, start_date: datetime) -> bool:
+    """Checks whether the robot which wrote a segment is still alive."""
+    try:
+        create_time = int(psutil.Process(pid).create_time())
+    except (psutil.NoSuchProcess, psutil.AccessDenied):
+        return False
+    return create_time == int(start_date.timestamp())
+
+
+def _sql_datetime(value: str) -> datetime:
+    """Converts a journal timestamp into the naive UTC datetime
+    stored in the `robots` table."""
+    return datetime.fromisoformat(value).astimezone(
+        timezone.utc).replace(tzinfo=None)
+
+
+def _is_valid(record: Dict) -> bool:
+    """Checks that a record has the fields needed to replay it."""
+    try:
+        datetime.fromisoformat(record['start_date'])
+    except (KeyError, TypeError, ValueError):
+        return False
+    if not isinstance(record.get('pid'), int):
+        return False
+    if record.get('event') == EXIT:
+        duration = record.get('duration')
+        robot_id = record.get('id')
+        return (isinstance(duration, int) and
+                (robot_id is None or isinstance(robot_id, int)))
+    return True
+
+
+def _quarantine(path: Path):
+    """Moves a segment with invalid records out of the replay."""
+    logger.error(f'Invalid robot journal segment {path}, moved to '
+                 f'{path.with_suffix(".bad")}')
+    try:
+        path.replace(path.with_suffix('.bad'))
+    except OSError:
+        pass
+
+
+def _collect(directory: Path) -> Tuple[List[Dict], List[Path]]:
+    """Collects the exit records of finished robots.
+
+    Segments are only collected once the robot which writes them has
+    exited. Segments with invalid records are quarantined (renamed to `.bad`),
+    so they can't block the replay of the others.
+
+    :param directory: The journal directory.
+    :return: A tuple of exit records and segments which can be removed
+        once the records are applied.
+    """
+    exits, done = [], []
+    for path in sorted(directory.glob('*.log')):
+        records = _read_segment(path)
+        if not all(isinstance(r, dict) and _is_valid(r) for r in records):
+            _quarantine(path)
+            continue
+        if records:
+            start_date = datetime.fromisoformat(records[0]['start_date'])
+            if _is_running(records[0]['pid'], start_date):
+                # The robot may still register itself or write records:
+                # wait until it has exited.
+                continue
+
+        exit_record = next(
+            (r for r in reversed(records) if r.get('event') == EXIT), None)
+
+        if exit_record:
+            if not exit_record.get('id'):
+                # Stopped while registering: take the id from the start.
+                exit_record = {**exit_record, 'id': next(
+                    (r.get('id') for r in records
+                     if r.get('event') == START and r.get('id')), None)}
+            exits.append(exit_record)
+            done.append(path)
+        elif records:
+            # Killed without an exit record: nothing to apply.
+            done.append(path)
+        else:
+            # Nothing reached the disk before the robot died.
+            try:
+                pid = int(path.stem.split('-')[0])
+            except ValueError:
+                _quarantine(path)
+                continue
+            if not psutil.pid_exists(pid):
+                done.append(path)
+    return exits, done
+
+
+@connection_and_session
+async def _apply(connection: AsyncConnection,
+                 session: AsyncSession,
+                 exits: List[Dict]) -> int:
+    """Applies exit records to the `robots` table in a single transaction.
+
+    A record is applied only while the duration of the robot is not set,
+    so replaying the same record again changes nothing.
+
+    :param connection: The asynchronous database connection.
+    :param session: The asynchronous database session.
+    :param exits: Exit records.
+    :return: The number of updated robots.
+    """
+    updates = []
+    for record in exits:
+        robot_id: Optional[int] = record.get('id')
+        if not robot_id:
+            # The robot could not register itself: find or create its row.
+            start_date = _sql_datetime(record['start_date'])
+            row = await session.execute(
+                select(Robot.id).where(and_(Robot.pid == record['pid'],
+                                            Robot.start_date == start_date)))
+            robot_id = row.scalar()
+            if not robot_id:
+                try:
+                    start_number = int(record.get('start_number') or 0)
+                except ValueError:
+                    start_number = 0
+                robot = Robot(start_date, start_number, record['pid'])
+                session.add(robot)
+                await session.flush()
+                robot_id = robot.id
+        updates.append({'robot_id': robot_id,
+                        'robot_duration': record['duration']})
+
+    result = await session.execute(
+        update(Robot.__table__)
+        .where(and_(Robot.__table__.c.id == bindparam('robot_id'),
+                    Robot.__table__.c.duration.is_(None)))
+        .values(duration=bindparam('robot_duration'),
+                updated_at=func.datetime('now')),
+        updates)
+    await session.commit()
+
+    return result.rowcount
+
+
+async def replay_journal(directory: Path = None) -> int:
+    """Replays the robot journal into the `robots` table.
+
+    Exit records are applied in bulk, after which the segments of finished
+    robots are removed. If the database is busy the segments are kept and
+    applied on the next replay.
+
+    :param directory: The journal directory.
+    :return: The number of updated robots.
+    """
+    directory = Path(directory or settings.journal_dir)
+    if not directory.exists():
+        return 0
+
+    exits, done = await asyncio.to_thread(_collect, directory)
+    if not done:
+        return 0
+
+    updated = 0
+    if exits:
+        updated = await _apply(exits)
+        if updated is None:
+            # connection_and_session has already reported the error.
+            return 0
+
+    for path in done:
+        try:
+            path.unlink()
+        except OSError:
+            # Still open by an exiting robot on Windows, retry next time.
+            pass
+
+    if updated:
+        logger.info(f'Replayed {updated} robot exit records from the journal.')
+    return updated
@@ -0,0 +1,76 @@
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from ...settings import settings
+
+START = 'start'
+EXIT = 'exit'
+
+
+class JournalWriter:
+    """
+    Append-only journal of the lifecycle events of a single robot.
+
+    Every robot writes its own segment file `<pid>-<start time>.log`
+    in the journal directory, one JSON record per line, so robots never
+    contend for the same file. Records are flushed to the OS immediately
+    and fsync'ed in batches; `sync` forces an fsync, e.g. before exit.
+
+    ## Example
+
+    ```python
+    journal = JournalWriter(pid, start_date)
+    journal.append(EXIT, id=robot_id, duration=10)
+    journal.sync()
+    ```
+    """
+    def __init__(self, pid: int, start_date: datetime,
+                 directory: Path = None,
+                 sync_interval: float = None, sync_batch: int = None):
+        directory = Path(directory or settings.journal_dir)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        self.pid = pid
+        self.start_date = start_date
+        self.path = directory / f'{pid}-{int(start_date.timestamp())}.log'
+        self.sync_interval = (settings.journal_sync_interval
+                              if sync_interval is None else sync_interval)
+        self.sync_batch = (settings.journal_sync_batch
+                           if sync_batch is None else sync_batch)
+        self._file = open(self.path, 'ab')
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def append(self, event: str, **fields):
+        """Appends a record to the journal.
+
+        :param event: Type of the event: START or EXIT.
+        :param fields: Additional fields of the record.
+        """
+        record = {
+            'event': event,
+            'pid': self.pid,
+            'start_date': self.start_date.isoformat(),
+            **fields
+        }
+        self._file.write(json.dumps(record).encode() + b'\n')
+        self._file.flush()
+        self._pending += 1
+
+        if (self._pending >= self.sync_batch or
+                time.monotonic() - self._last_sync >= self.sync_interval):
+            self.sync()
+
+    def sync(self):
+        """Forces the appended records to disk."""
+        if self._pending:
+            os.fsync(self._file.fileno())
+            self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        self.sync()
+        self._file.close()
@@ -1,8 +1,6 @@
 import asyncio
-from typing import Dict, List
+from typing import Dict, List, Optional
 import json
-import os
-import sys
 from pathlib import Path
 from datetime import datetime, timezone, timedelta
 
@@ -13,10 +11,8 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession,\
     AsyncConnection
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
-
 from .connection import connection_and_session
-from models import Robot, SRobot
+from ..models import Robot, SRobot
 
 
 @connection_and_session
@@ -66,17 +62,60 @@ async def update_robot(connection: AsyncConnection,
     return robot.rowcount > 0
 
 
+def _utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Converts a datetime into the naive UTC stored in the database."""
+    if value is not None and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _stats_filters(start_date_from: Optional[datetime] = None,
+                   start_date_to: Optional[datetime] = None,
+                   pid: Optional[int] = None,
+                   min_duration: Optional[int] = None,
+                   max_duration: Optional[int] = None,
+                   status: Optional[str] = None) -> List:
+    """Builds the WHERE conditions of a robot run statistics query.
+
+    :return: A list of SQLAlchemy conditions.
+    """
+    filters = []
+    if start_date_from is not None:
+        filters.append(Robot.start_date >= _utc(start_date_from))
+    if start_date_to is not None:
+        filters.append(Robot.start_date < _utc(start_date_to))
+    if pid is not None:
+        filters.append(Robot.pid == pid)
+    if min_duration is not None:
+        filters.append(Robot.duration >= min_duration)
+    if max_duration is not None:
+        filters.append(Robot.duration <= max_duration)
+    if status == 'running':
+        filters.append(Robot.duration.is_(None))
+    elif status == 'finished':
+        filters.append(Robot.duration.is_not(None))
+    return filters
+
+
 @connection_and_session
 async def get_stats(connection: AsyncConnection,
                     session: AsyncSession,
-                    offset: int, limit: int, order_by: str) -> List[SRobot]:
-    """Retrieves robot run statistics with pagination and sorting.
+                    offset: int, limit: int, order_by: str,
+                    **filters) -> List[SRobot]:
+    """Retrieves robot run statistics with filtering, pagination and sorting.
 
     :param connection: Asynchronous database connection.
     :param session: Asynchronous database session.
     :param offset: Offset from the beginning of the result set.
     :param limit: Maximum number of records to return.
     :param order_by: Sorting direction: 'asc' or 'desc'.
+    :param filters: Optional filters:
+            * 'start_date_from': Runs started at or after this time.
+            * 'start_date_to': Runs started before this time.
+            * 'pid': Process id of the robot run.
+            * 'min_duration': Minimum duration of the robot run.
+            * 'max_duration': Maximum duration of the robot run.
+            * 'status': 'running' or 'finished'.
     :return: A list of dictionaries representing statistics
             for each robot run.
             Each dictionary contains the following keys:
@@ -90,7 +129,8 @@ async def get_stats(connection: AsyncConnection,
         Robot.start_date)
 
     robot_runs = await session.execute(
-        select(Robot).order_by(sort_field).offset(offset).limit(limit))
+        select(Robot).where(*_stats_filters(**filters))
+        .order_by(sort_field).offset(offset).limit(limit))
 
     robot_runs = robot_runs.scalars().all()
 
@@ -101,6 +141,27 @@ async def get_stats(connection: AsyncConnection,
     return schemas_robot
 
 
+@connection_and_session
+async def count_stats(connection: AsyncConnection,
+                      session: AsyncSession,
+                      **filters) -> int:
+    """Counts the robot runs matching the filters of `get_stats`.
+
+    Every filtered column is part of the `robots` indexes, so the count
+    is computed from a covering index without reading the table.
+
+    :param connection: Asynchronous database connection.
+    :param session: Asynchronous database session.
+    :param filters: The same filters as in `get_stats`.
+    :return: The number of matching robot runs.
+    """
+    total = await session.execute(
+        select(func.count()).select_from(Robot)
+        .where(*_stats_filters(**filters)))
+
+    return total.scalar()
+
+
 @connection_and_session
 async def get_process(connection: AsyncConnection,
                       session: AsyncSession,
@@ -0,0 +1,7 @@
+from .profiler import (ProfilingMiddleware, RequestProfile, ProfileStore,
+                       profiles, span, is_valid_token)
+
+__all__ = [
+    'ProfilingMiddleware', 'RequestProfile', 'ProfileStore', 'profiles',
+    'span', 'is_valid_token'
+]
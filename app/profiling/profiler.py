@@ -0,0 +1,295 @@
+import asyncio
+import contextvars
+import hmac
+import random
+import sys
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+from ..settings import settings
+
+_current_profile: contextvars.ContextVar = contextvars.ContextVar(
+    'current_profile', default=None)
+
+_NULL_SPAN = nullcontext()
+
+# Call tree collectors of the profiled requests, by asyncio task.
+_task_profilers: Dict[asyncio.Task, '_TaskProfiler'] = {}
+
+
+class RequestProfile:
+    """
+    Profile of a single HTTP request: the wall-clock time spent in each
+    category (database, psutil, subprocess) and the call tree of the
+    request's own asyncio task.
+    """
+    def __init__(self, method: str, path: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.started_at = datetime.now(timezone.utc)
+        self.status_code: Optional[int] = None
+        self.wall_time = 0.0
+        self.categories: Dict[str, Dict] = {}
+        self.call_tree: Optional[List[Dict]] = None
+
+    def add(self, category: str, elapsed: float):
+        """Adds the time spent in a category.
+
+        :param category: Name of the category (e.g. 'db').
+        :param elapsed: Wall-clock time in seconds.
+        """
+        stat = self.categories.setdefault(category,
+                                          {'time': 0.0, 'calls': 0})
+        stat['time'] += elapsed
+        stat['calls'] += 1
+
+    def summary(self) -> Dict:
+        """Returns a short description of the profile."""
+        return {
+            'id': self.id,
+            'method': self.method,
+            'path': self.path,
+            'started_at': self.started_at,
+            'status_code': self.status_code,
+            'wall_time': self.wall_time,
+        }
+
+    def to_dict(self) -> Dict:
+        """Returns the full profile as a JSON-serializable dictionary."""
+        accounted = sum(stat['time'] for stat in self.categories.values())
+        return {
+            **self.summary(),
+            'categories': self.categories,
+            'other_time': max(0.0, self.wall_time - accounted),
+            'call_tree': self.call_tree,
+        }
+
+
+class ProfileStore:
+    """
+    Bounded in-memory storage of the most recent request profiles.
+    """
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._profiles: OrderedDict = OrderedDict()
+
+    def add(self, profile: RequestProfile):
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.maxlen:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[RequestProfile]:
+        return list(reversed(self._profiles.values()))
+
+
+profiles = ProfileStore(settings.profile_history)
+
+
+class _Span:
+    __slots__ = ('profile', 'category', 'start')
+
+    def __init__(self, profile: RequestProfile, category: str):
+        self.profile = profile
+        self.category = category
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.add(self.category, time.perf_counter() - self.start)
+        return False
+
+
+def span(category: str):
+    """Measures the wall-clock time of a block for the current profile.
+
+    When the current request is not profiled a shared no-op context
+    manager is returned, so the cost is a single context variable lookup.
+    The block may contain `await`: the time spent waiting is counted too.
+
+    :param category: Name of the category (e.g. 'db', 'psutil').
+    :return: A context manager.
+
+    ## Example
+
+    ```python
+    with span('psutil'):
+        p = psutil.Process(pid)
+    ```
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NULL_SPAN
+    return _Span(profile, category)
+
+
+class _TaskProfiler:
+    """
+    Deterministic profiler of a single asyncio task.
+
+    A coroutine which awaits returns to the event loop and is called again
+    when it is resumed, so only the time the task actually runs is
+    recorded; code of other tasks running meanwhile is not. The time spent
+    waiting is reported by the spans instead.
+    """
+    def __init__(self):
+        # (filename, line, function) -> [calls, total, cumulative, callers]
+        self.stats: Dict[tuple, list] = {}
+        self._stack: List[list] = []
+        self._active: Dict[tuple, int] = {}
+        self._frames = set()
+
+    def event(self, frame, event: str):
+        now = time.perf_counter()
+        if event == 'call':
+            code = frame.f_code
+            key = (code.co_filename, code.co_firstlineno, code.co_name)
+            stat = self.stats.get(key)
+            if stat is None:
+                stat = self.stats[key] = [0, 0.0, 0.0, set()]
+            # A resumed coroutine keeps its frame: count it once.
+            if id(frame) not in self._frames:
+                self._frames.add(id(frame))
+                stat[0] += 1
+            if self._stack:
+                stat[3].add(self._stack[-1][0])
+            self._active[key] = self._active.get(key, 0) + 1
+            self._stack.append([key, now, 0.0])
+        elif self._stack:
+            key, start, children = self._stack.pop()
+            elapsed = now - start
+            stat = self.stats[key]
+            stat[1] += elapsed - children
+            self._active[key] -= 1
+            # Recursive calls are already part of the outer call.
+            if not self._active[key]:
+                stat[2] += elapsed
+            if self._stack:
+                self._stack[-1][2] += elapsed
+
+    def call_tree(self, top: int) -> List[Dict]:
+        """Returns the heaviest functions together with their callers.
+
+        :param top: Number of functions to return.
+        :return: Functions sorted by cumulative time.
+        """
+        def name(func) -> str:
+            filename, line, function = func
+            return f'{filename}:{line}({function})'
+
+        heaviest = sorted(self.stats.items(), key=lambda item: item[1][2],
+                          reverse=True)[:top]
+
+        return [
+            {
+                'function': name(func),
+                'calls': calls,
+                'total_time': total,
+                'cumulative_time': cumulative,
+                'callers': [name(caller) for caller in callers],
+            }
+            for func, (calls, total, cumulative, callers) in heaviest
+        ]
+
+
+def _dispatch(frame, event, arg):
+    """`sys.setprofile` hook which passes the events of profiled tasks
+    to their collectors."""
+    if event != 'call' and event != 'return':
+        return
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return
+    profiler = _task_profilers.get(task)
+    if profiler is not None:
+        profiler.event(frame, event)
+
+
+def _start_task_profiler(task: asyncio.Task) -> _TaskProfiler:
+    profiler = _TaskProfiler()
+    if not _task_profilers:
+        sys.setprofile(_dispatch)
+    _task_profilers[task] = profiler
+    return profiler
+
+
+def _stop_task_profiler(task: asyncio.Task):
+    _task_profilers.pop(task, None)
+    if not _task_profilers:
+        sys.setprofile(None)
+
+
+def is_valid_token(token: Optional[str]) -> bool:
+    """Checks a token against `ROBOTS_ADMIN_TOKEN`.
+
+    :param token: The token sent by the client.
+    :return: False if no token is configured or it doesn't match.
+    """
+    if not settings.admin_token or not token:
+        return False
+    return hmac.compare_digest(token.encode(), settings.admin_token.encode())
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware which profiles requests that opt in with the
+    `X-Profile: <ROBOTS_ADMIN_TOKEN>` header or fall into the sampling rate
+    (`ROBOTS_PROFILE_SAMPLE_RATE`). Unprofiled requests are passed through
+    untouched.
+
+    While any request is profiled a `sys.setprofile` hook is active in the
+    event loop thread, which slows down all concurrent requests.
+
+    The id of the collected profile is returned in the `X-Profile-Id`
+    response header; the profile itself is available at
+    `GET /admin/profiles/{profile_id}`.
+    """
+    def __init__(self, app):
+        self.app = app
+        self.header = settings.profile_header.lower().encode('latin-1')
+        self.sample_rate = settings.profile_sample_rate
+
+    def _is_requested(self, scope) -> bool:
+        for key, value in scope['headers']:
+            if key == self.header:
+                return is_valid_token(value.decode('latin-1'))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._is_requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope['method'], scope['path'])
+        token = _current_profile.set(profile)
+        profiles.add(profile)
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                profile.status_code = message['status']
+                headers = list(message.get('headers', []))
+                headers.append((b'x-profile-id', profile.id.encode()))
+                message = {**message, 'headers': headers}
+            await send(message)
+
+        task = asyncio.current_task()
+        profiler = _start_task_profiler(task)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.wall_time = time.perf_counter() - start
+            _stop_task_profiler(task)
+            profile.call_tree = profiler.call_tree(settings.profile_top)
+            _current_profile.reset(token)
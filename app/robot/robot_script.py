@@ -3,14 +3,15 @@ import argparse
 import datetime
 import logging
 import signal
-import psutil
 import time
-import sys
-import os
 
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+# Needed before the first tick: the process create_time is the start date
+# of the journal segment and must match what the API reads for /stop.
+import psutil
 
-from db import services
+# The package imports the database stack lazily: only the journal is
+# loaded before the first tick.
+from ..db import services
 
 parser = argparse.ArgumentParser(description='Asynchronous counter that prints '
                                              'numbers to the console every '
@@ -22,8 +23,6 @@ parser.add_argument('-c', '--count', dest='count', default=0,
 
 args = parser.parse_args()
 
-update_queue = asyncio.Queue()
-
 terminate_flag = False
 
 robot_id = 0
@@ -32,6 +31,11 @@ p = psutil.Process()
 
 start_time = p.create_time()
 
+start_date = datetime.datetime.fromtimestamp(start_time,
+                                             tz=datetime.timezone.utc)
+
+journal = services.JournalWriter(p.pid, start_date)
+
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -48,7 +52,11 @@ def handle_sigbreak(signum, frame):
 
     duration = int(time.time() - start_time)
 
-    update_queue.put_nowait(services.update_robot(robot_id, duration))
+    # The API replays the journal into the database, so the exit path
+    # doesn't wait for (possibly locked) SQLite.
+    journal.append(services.EXIT, id=robot_id, duration=duration,
+                   start_number=args.count)
+    journal.sync()
 
     logger.info(f'The robot has been stopped. Duration of work: {duration} '
                 f'seconds. Its PID is {p.pid}')
@@ -65,50 +73,48 @@ async def print_number(start_number: int):
         await asyncio.sleep(1)
 
 
-async def process_update_queue():
-    """Processes tasks from the update queue asynchronously.
-
-    This function continuously retrieves tasks from the `update_queue`
-    and awaits their completion.
-    :return:
-    """
-    while True:
-        update_task = await update_queue.get()
-        await update_task
-
-
 async def main():
     """Parses command-line arguments, sets up the counter, and starts asynchronous tasks.
 
-    This function handles argument parsing, creates a new robot entry
-    in the database,
-    sets up tasks for printing numbers and processing updates,
-    and waits for their completion.
+    This function starts printing numbers right away, then creates a new
+    robot entry in the database, records its start in the journal and
+    waits until the robot is stopped.
     """
     try:
-        tz = datetime.timezone.utc
-        sql_datetime = datetime.datetime.fromtimestamp(start_time,
-                                                       tz=tz)
-        start_time_str = sql_datetime.strftime('%Y-%m-%d %H:%M:%S')
+        start_number = int(args.count)
         logger.info(f'The robot was launched with PID: {p.pid}')
 
-        global robot_id
-        await services.create_database()
-        robot_id = await services.set_robot(sql_datetime, int(args.count), p.pid)
-        update_task = asyncio.create_task(process_update_queue())
-        print_task = asyncio.create_task(print_number(int(args.count)))
-
-        await asyncio.wait([update_task, print_task],
-                           return_when=asyncio.FIRST_COMPLETED)
+        print_task = asyncio.create_task(print_number(start_number))
+        # Print the first number, then load the database stack off the
+        # event loop. Until the robot is registered, /stop?pid=<pid>
+        # answers 400 "not found among the running ones".
+        await asyncio.sleep(0)
+        await asyncio.to_thread(getattr, services, 'set_robot')
+
+        # A robot stopped before registering itself has already written
+        # its exit record; the API replay creates its row from it.
+        if not terminate_flag:
+            global robot_id
+            await services.create_database()
+            robot_id = await services.set_robot(start_date, start_number,
+                                                p.pid)
+            journal.append(services.START, id=robot_id,
+                           start_number=start_number)
+
+        await print_task
     except ValueError:
         logger.error('Error: --count argument must be a number.')
     except (psutil.NoSuchProcess, psutil.AccessDenied):
         logger.error('An error occurred with the process')
 
 
-signal.signal(signal.SIGBREAK, handler=handle_sigbreak)
+if hasattr(signal, 'SIGBREAK'):
+    signal.signal(signal.SIGBREAK, handler=handle_sigbreak)
 signal.signal(signal.SIGINT, handler=handle_sigbreak)
 signal.signal(signal.SIGTERM, handler=handle_sigbreak)
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    try:
+        asyncio.run(main())
+    finally:
+        journal.close()
@@ -0,0 +1,5 @@
+from .settings import Settings, settings
+
+__all__ = [
+    'Settings', 'settings'
+]
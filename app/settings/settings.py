@@ -0,0 +1,94 @@
+import os
+from pathlib import Path
+
+
+def _env_float(name: str, default: float) -> float:
+    """Reads a float value from the environment.
+
+    :param name: Name of the environment variable.
+    :param default: Value used when the variable is unset or invalid.
+    :return: The parsed value.
+    """
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_int(name: str, default: int) -> int:
+    """Reads an integer value from the environment.
+
+    :param name: Name of the environment variable.
+    :param default: Value used when the variable is unset or invalid.
+    :return: The parsed value.
+    """
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+class Settings:
+    """
+    Runtime configuration of the API, read from environment variables
+    prefixed with `ROBOTS_`.
+
+    ## Example
+
+    ```bash
+    $ ROBOTS_PROFILE_SAMPLE_RATE=0.01 uvicorn main:app
+    ```
+    """
+    def __init__(self):
+        # Fraction of requests (0.0 - 1.0) profiled without the opt-in header.
+        self.profile_sample_rate = _env_float('ROBOTS_PROFILE_SAMPLE_RATE',
+                                              0.0)
+        # Token of the /admin endpoints and of the profiling opt-in header.
+        # Both are disabled while it is not set.
+        self.admin_token = os.environ.get('ROBOTS_ADMIN_TOKEN')
+        # Request header which opts a single request into profiling;
+        # its value must be the admin token.
+        self.profile_header = os.environ.get('ROBOTS_PROFILE_HEADER',
+                                             'X-Profile')
+        # Number of most recent profiles kept in memory.
+        self.profile_history = _env_int('ROBOTS_PROFILE_HISTORY', 50)
+        # Number of functions shown in the call tree of a profile.
+        self.profile_top = _env_int('ROBOTS_PROFILE_TOP', 40)
+
+        # Maximum number of robots running at the same time.
+        self.max_robots = _env_int('ROBOTS_MAX_ROBOTS', 50)
+        # Maximum number of starts waiting for free capacity.
+        self.start_queue_size = _env_int('ROBOTS_START_QUEUE_SIZE', 10)
+        # Seconds a queued start waits before it is rejected.
+        self.start_queue_timeout = _env_float('ROBOTS_START_QUEUE_TIMEOUT',
+                                              30.0)
+        # Host thresholds; a start is delayed while any of them is reached.
+        # 0 disables the check.
+        self.max_cpu_percent = _env_float('ROBOTS_MAX_CPU_PERCENT', 90.0)
+        self.max_memory_percent = _env_float('ROBOTS_MAX_MEMORY_PERCENT',
+                                             90.0)
+        # One-minute load average divided by the number of CPUs.
+        self.max_load_per_cpu = _env_float('ROBOTS_MAX_LOAD_PER_CPU', 2.0)
+        # Value of the Retry-After header of rejected starts, in seconds.
+        self.retry_after = _env_int('ROBOTS_RETRY_AFTER', 5)
+
+        # SQLite database file.
+        self.database_file = Path(os.environ.get(
+            'ROBOTS_DATABASE_FILE',
+            Path(__file__).resolve().parent.parent / 'db' / 'robots.db'))
+
+        # Directory of the robot lifecycle journal.
+        self.journal_dir = Path(os.environ.get(
+            'ROBOTS_JOURNAL_DIR',
+            Path(__file__).resolve().parent.parent / 'db' / 'journal'))
+        # Seconds between fsync calls of a journal writer.
+        self.journal_sync_interval = _env_float(
+            'ROBOTS_JOURNAL_SYNC_INTERVAL', 1.0)
+        # Number of records after which a journal writer calls fsync.
+        self.journal_sync_batch = _env_int('ROBOTS_JOURNAL_SYNC_BATCH', 32)
+        # Seconds between replays of the journal into the database.
+        self.journal_replay_interval = _env_float(
+            'ROBOTS_JOURNAL_REPLAY_INTERVAL', 5.0)
+
+
+settings = Settings()
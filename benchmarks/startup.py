@@ -0,0 +1,169 @@
+"""Cold start benchmark of the API and the robot.
+
+Measures, as the median of several runs:
+
+* the `-X importtime` cumulative import time of `main` and of the robot
+  entry point, together with the slowest imports;
+* the time from spawning uvicorn until the API answers a request
+  (time-to-ready), and until it answers its first `/stats` query, which
+  loads the database stack and competes with the background migration;
+* the time from spawning a robot until it prints its first number
+  (time-to-first-tick).
+
+The runs use a temporary database and journal, so the real
+`robots.db` is not touched.
+
+## Example
+
+```bash
+$ python benchmarks/startup.py --runs 5
+```
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+ROBOT_MODULE = 'app.robot.robot_script'
+
+
+def parse_importtime(stderr: str) -> Dict[str, Tuple[int, int]]:
+    """Parses `-X importtime` output.
+
+    :param stderr: The standard error of the process.
+    :return: A mapping of module name to (self, cumulative) microseconds.
+    """
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+
+def import_time(args: List[str], env: Dict) -> Dict[str, Tuple[int, int]]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', *args],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+    return parse_importtime(result.stderr)
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def api_time_to_ready(env: Dict, timeout: float = 30.0) -> Tuple[float, float]:
+    """Starts uvicorn and waits for the first successful response and then
+    for the first successful `/stats` query.
+
+    :return: A tuple of time-to-ready and time-to-first-query.
+    """
+    port = free_port()
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--port', str(port)],
+        cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        ready = None
+        while time.perf_counter() - start < timeout:
+            try:
+                if ready is None:
+                    urllib.request.urlopen(
+                        f'http://127.0.0.1:{port}/openapi.json', timeout=1)
+                    ready = time.perf_counter() - start
+                urllib.request.urlopen(
+                    f'http://127.0.0.1:{port}/stats?limit=1', timeout=5)
+                return ready, time.perf_counter() - start
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError('The API did not start.')
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def robot_time_to_first_tick(env: Dict) -> float:
+    """Starts a robot and waits for the first printed number."""
+    start = time.perf_counter()
+    robot = subprocess.Popen(
+        [sys.executable, '-m', ROBOT_MODULE, '--count', '0'],
+        cwd=PROJECT_ROOT, env={**env, 'PYTHONUNBUFFERED': '1'},
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        robot.stdout.readline()
+        return time.perf_counter() - start
+    finally:
+        robot.terminate()
+        robot.wait()
+
+
+def robot_import_time(env: Dict) -> Dict[str, Tuple[int, int]]:
+    """Collects `-X importtime` of a robot up to its first number."""
+    robot = subprocess.Popen(
+        [sys.executable, '-X', 'importtime', '-m', ROBOT_MODULE],
+        cwd=PROJECT_ROOT, env={**env, 'PYTHONUNBUFFERED': '1'},
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    robot.stdout.readline()
+    robot.kill()
+    _, stderr = robot.communicate()
+    return parse_importtime(stderr)
+
+
+def report(title: str, imports: Dict[str, Tuple[int, int]], top: int):
+    total = sum(self_us for self_us, _ in imports.values())
+    print(f'{title}: {total / 1000:.1f} ms in {len(imports)} imports')
+    slowest = sorted(imports.items(), key=lambda item: item[1][0],
+                     reverse=True)[:top]
+    for name, (self_us, cumulative_us) in slowest:
+        print(f'    {self_us / 1000:8.1f} ms  {name}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cold start benchmark of '
+                                                 'the API and the robot.')
+    parser.add_argument('-r', '--runs', type=int, default=5,
+                        help='Number of runs (default: 5)')
+    parser.add_argument('-t', '--top', type=int, default=10,
+                        help='Number of the slowest imports shown '
+                             '(default: 10)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {
+            **os.environ,
+            'ROBOTS_DATABASE_FILE': os.path.join(tmp, 'robots.db'),
+            'ROBOTS_JOURNAL_DIR': os.path.join(tmp, 'journal'),
+        }
+
+        report('API imports (main)',
+               import_time(['-c', 'import main'], env), args.top)
+        report('Robot imports before the first tick',
+               robot_import_time(env), args.top)
+
+        api = [api_time_to_ready(env) for _ in range(args.runs)]
+        ready = [r for r, _ in api]
+        query = [q for _, q in api]
+        tick = [robot_time_to_first_tick(env) for _ in range(args.runs)]
+
+    print(f'API time-to-ready:       '
+          f'{statistics.median(ready) * 1000:.0f} ms (median of {args.runs})')
+    print(f'API time-to-first-query: '
+          f'{statistics.median(query) * 1000:.0f} ms (median of {args.runs})')
+    print(f'Robot time-to-first-tick: '
+          f'{statistics.median(tick) * 1000:.0f} ms (median of {args.runs})')
+
+
+if __name__ == '__main__':
+    main()